@@ -0,0 +1 @@
+"""Puts src on sys.path (pytest inserts this file's directory), so tests import lib.* like the notebooks."""
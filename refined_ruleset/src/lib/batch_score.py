@@ -0,0 +1,251 @@
+"""Module for scoring event dumps that don't fit in memory.
+
+The dump is a json lines file, one event per line, each carrying the wallet
+address alongside the usual example json fields. Scoring runs in two phases:
+
+1. External sort: read chunks up to a memory budget, sort each by
+   (address, timestamp, logIndex) and spill it to a run file.
+2. Merge the runs and stream each wallet's contiguous events through an
+   Obligor, writing one json line of results per wallet. A wallet whose
+   events can't be replayed gets a line with the error instead.
+
+Both phases leave markers in work_dir, so a killed job picks up where it
+left off instead of starting over.
+"""
+
+import heapq
+import json
+import os
+import shutil
+from itertools import groupby
+from typing import Callable, Iterator, List, Optional, Tuple
+
+from lib.compute_score import apply_event
+from lib.obligor_v2 import BaseObligor, Obligor
+from lib.obligor_score_only import ScoreOnlyObligor
+from lib.obligor_sensitivity import SENSITIVITY_PARAMS
+from lib.credit_migration_schema import MigrationParams
+from lib.default_migration_params import MIGRATION_PARAMS
+
+# rough python overhead per buffered event on top of its raw line length
+_RECORD_OVERHEAD_BYTES = 200
+
+_MANIFEST = "manifest.json"
+_PROGRESS = "progress.json"
+
+SortKey = Tuple[str, int, int]
+
+
+def _write_json(path: str, payload: dict) -> None:
+    """Write json atomically so a crash never leaves a half written marker."""
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(payload, f)
+    os.replace(tmp_path, path)
+
+
+def _read_json(path: str) -> Optional[dict]:
+    if not os.path.exists(path):
+        return None
+    with open(path, "r") as f:
+        return json.load(f)
+
+
+def _sort_key(event: dict, address_key: str) -> SortKey:
+    return (event[address_key].lower(), int(event["timestamp"]), int(event["logIndex"]))
+
+
+def _spill(buffer: List[Tuple[SortKey, str]], run_dir: str, run_num: int) -> str:
+    """Sort buffered lines and write them to a new run file."""
+    buffer.sort(key=lambda item: item[0])
+    path = os.path.join(run_dir, "run_{0:06d}.jsonl".format(run_num))
+    with open(path, "w") as f:
+        for _, line in buffer:
+            f.write(line)
+    return path
+
+
+def _read_run(path: str, address_key: str) -> Iterator[Tuple[SortKey, dict]]:
+    with open(path, "r") as f:
+        for line in f:
+            event = json.loads(line)
+            yield _sort_key(event, address_key), event
+
+
+def _merge_runs(paths: List[str], address_key: str) -> Iterator[Tuple[SortKey, dict]]:
+    return heapq.merge(*[_read_run(path, address_key) for path in paths], key=lambda item: item[0])
+
+
+def _sort_runs(input_path: str, run_dir: str, memory_budget: int, address_key: str, fan_in: int) -> List[str]:
+    """Split input into sorted runs, then merge down until at most fan_in remain."""
+    runs: List[str] = []
+    buffer: List[Tuple[SortKey, str]] = []
+    buffered_bytes = 0
+
+    with open(input_path, "r") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            if not line.endswith("\n"):
+                line += "\n"
+            buffer.append((_sort_key(json.loads(line), address_key), line))
+            buffered_bytes += len(line) + _RECORD_OVERHEAD_BYTES
+            if buffered_bytes >= memory_budget:
+                runs.append(_spill(buffer, run_dir, len(runs)))
+                buffer = []
+                buffered_bytes = 0
+    if buffer:
+        runs.append(_spill(buffer, run_dir, len(runs)))
+
+    # keep the number of files open at once bounded
+    run_num = len(runs)
+    while len(runs) > fan_in:
+        merged: List[str] = []
+        for i in range(0, len(runs), fan_in):
+            group = runs[i : i + fan_in]
+            path = os.path.join(run_dir, "run_{0:06d}.jsonl".format(run_num))
+            run_num += 1
+            with open(path, "w") as f:
+                for _, event in _merge_runs(group, address_key):
+                    f.write(json.dumps(event) + "\n")
+            for old in group:
+                os.remove(old)
+            merged.append(path)
+        runs = merged
+    return runs
+
+
+def score_event_dump(
+    input_path: str,
+    output_path: str,
+    work_dir: str,
+    start_alpha: int,
+    start_beta: int,
+    migration_params: MigrationParams = MIGRATION_PARAMS,
+    protocol_name: str = "",
+    memory_budget: int = 256 * 1024 * 1024,
+    address_key: str = "address",
+    fan_in: int = 64,
+    checkpoint_every: int = 1000,
+    on_progress: Optional[Callable[[int, int], None]] = None,
+    score_only: bool = True,
+) -> int:
+    """Scores every wallet in a json lines event dump using bounded memory.
+
+    Args:
+        input_path (str): Json lines file, one event per line.
+        output_path (str): Json lines file to write one result per wallet to.
+        work_dir (str): Directory for run files and resume markers, reused on resume.
+        start_alpha (int): Initial alpha for every wallet.
+        start_beta (int): Initial beta for every wallet.
+        migration_params (MigrationParams): Params passed to every obligor.
+        protocol_name (str): Protocol the events come from.
+        memory_budget (int): Approximate bytes of events buffered per sorted run.
+        address_key (str): Field holding the wallet address.
+        fan_in (int): Max run files merged at once.
+        checkpoint_every (int): Wallets scored between resume markers.
+        on_progress (Callable[[int, int], None]): Optional callback with (wallets, events) scored so far.
+        score_only (bool): Replay with the minimal state ScoreOnlyObligor, same scores.
+
+    Returns:
+        int: Number of wallets written in this call, including error lines.
+    """
+    run_dir = os.path.join(work_dir, "runs")
+    manifest_path = os.path.join(work_dir, _MANIFEST)
+    progress_path = os.path.join(work_dir, _PROGRESS)
+
+    # phase 1, external sort. a missing manifest means sorting never finished,
+    # one for a different (or since rewritten) input means starting over.
+    stat = os.stat(input_path)
+    source = {"input_path": os.path.abspath(input_path), "size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+    manifest = _read_json(manifest_path)
+    if manifest is None or manifest.get("source") != source:
+        if os.path.exists(manifest_path):
+            os.remove(manifest_path)
+        if os.path.exists(progress_path):
+            os.remove(progress_path)
+        shutil.rmtree(run_dir, ignore_errors=True)
+        os.makedirs(run_dir)
+        runs = _sort_runs(input_path, run_dir, memory_budget, address_key, fan_in)
+        _write_json(manifest_path, {"source": source, "runs": [os.path.basename(path) for path in runs]})
+    else:
+        runs = [os.path.join(run_dir, name) for name in manifest["runs"]]
+
+    # phase 2, replay. events come out grouped by address in ascending order,
+    # so everything up to last_address is already in the output. progress from
+    # a different output or different scoring inputs, or an output that lost
+    # bytes since, can't be trusted and replay starts over.
+    run = {
+        "output_path": os.path.abspath(output_path),
+        "start_alpha": start_alpha,
+        "start_beta": start_beta,
+        "migration_params": {name: getattr(migration_params, name) for name in SENSITIVITY_PARAMS},
+        "protocol_name": protocol_name,
+    }
+    progress = _read_json(progress_path)
+    if progress is not None and (
+        progress.get("run") != run
+        or not os.path.exists(output_path)
+        or os.path.getsize(output_path) < progress["output_bytes"]
+    ):
+        progress = None
+    if progress is None:
+        progress = {"run": run, "last_address": None, "output_bytes": 0}
+    last_address: Optional[str] = progress["last_address"]
+
+    obligor_cls = ScoreOnlyObligor if score_only else Obligor
+    num_wallets = 0
+    num_events = 0
+    reported_wallets = -1
+    mode = "r+b" if os.path.exists(output_path) else "wb"
+    with open(output_path, mode) as out:
+        out.truncate(progress["output_bytes"])  # drop results written after the last marker
+        out.seek(progress["output_bytes"])
+
+        merged = _merge_runs(runs, address_key)
+        for address, group in groupby(merged, key=lambda item: item[0][0]):
+            if last_address is not None and address <= last_address:
+                continue
+
+            obl: BaseObligor = obligor_cls(alpha=start_alpha, beta=start_beta, migration_params=migration_params)
+            num_wallet_events = 0
+            try:
+                for _, event in group:
+                    apply_event(obl=obl, event=event, protocol_name=protocol_name)
+                    num_wallet_events += 1
+                result = {
+                    "address": address,
+                    "num_events": num_wallet_events,
+                    "alpha": obl._alpha,
+                    "beta": obl._beta,
+                    "score": obl.get_score(),
+                    "conf_interval": list(obl.get_conf_interval()),
+                }
+            except Exception as e:
+                # e.g. a withdraw of collateral deposited before the dump starts.
+                # record it and move on, otherwise every resume dies on the same wallet.
+                result = {
+                    "address": address,
+                    "num_events": num_wallet_events,
+                    "error": repr(e),
+                }
+
+            out.write(json.dumps(result).encode() + b"\n")
+            last_address = address
+            num_wallets += 1
+            num_events += num_wallet_events
+
+            if num_wallets % checkpoint_every == 0:
+                out.flush()
+                os.fsync(out.fileno())
+                _write_json(progress_path, {"run": run, "last_address": last_address, "output_bytes": out.tell()})
+                if on_progress is not None:
+                    on_progress(num_wallets, num_events)
+                    reported_wallets = num_wallets
+
+        out.flush()
+        _write_json(progress_path, {"run": run, "last_address": last_address, "output_bytes": out.tell()})
+
+    if on_progress is not None and reported_wallets != num_wallets:
+        on_progress(num_wallets, num_events)
+    return num_wallets
@@ -0,0 +1,187 @@
+"""Batch credible intervals from the Beta(alpha, beta) posterior.
+
+Obligor.get_conf_interval uses a normal approximation, one obligor at a
+time, which is off near 0 or 1. These work on whole arrays of alpha / beta.
+
+Stickiness keeps alpha and beta each within [0, cap], so by default quantiles
+are precomputed on a grid over that square and bilinearly interpolated. Grid
+nodes are log spaced, since the quantiles change fastest for small params.
+Points off the grid fall back to the exact (slower) inverse.
+
+The grid is approximate, off by up to ~1e-5, which is enough to flip a
+rounded score now and then. Pass exact=True for bit exact Beta quantiles.
+"""
+
+from functools import lru_cache
+from typing import Sequence, Tuple
+
+import numpy as np
+from scipy.special import betaincinv
+
+from lib.credit_migration_schema import MigrationParams
+from lib.default_migration_params import MIGRATION_PARAMS
+
+
+def _as_params(alpha: np.ndarray, beta: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Flatten alpha / beta to float arrays, rejecting nan / inf."""
+    alpha = np.asarray(alpha, dtype=float).ravel()
+    beta = np.asarray(beta, dtype=float).ravel()
+    if alpha.shape != beta.shape:
+        raise ValueError("alpha and beta must have the same length")
+    if not (np.isfinite(alpha).all() and np.isfinite(beta).all()):
+        raise ValueError("alpha and beta must be finite")
+    return alpha, beta
+
+
+def _as_levels(levels: Sequence[float]) -> np.ndarray:
+    """Quantile levels as a float array, rejecting any outside (0, 1)."""
+    levels = np.asarray(levels, dtype=float).ravel()
+    if not np.all((levels > 0) & (levels < 1)):
+        raise ValueError("levels must be in (0, 1)")
+    return levels
+
+
+def _exact_quantiles(alpha: np.ndarray, beta: np.ndarray, levels: np.ndarray) -> np.ndarray:
+    """Exact quantiles, shape (len(levels), len(alpha)).
+
+    Degenerate posteriors (alpha or beta of 0) put all mass on 1 or 0.
+    """
+    with np.errstate(invalid="ignore", divide="ignore"):
+        out = betaincinv(alpha[None, :], beta[None, :], levels[:, None])
+    out = np.where(alpha[None, :] <= 0, 0.0, out)
+    out = np.where((beta[None, :] <= 0) & (alpha[None, :] > 0), 1.0, out)
+    return out
+
+
+class BetaQuantileTable:
+    def __init__(
+        self,
+        levels: Sequence[float] = (0.025, 0.975),
+        cap: float = MIGRATION_PARAMS.cap,
+        num_nodes: int = 512,
+        min_param: float = 0.5,
+    ) -> None:
+        """Precompute Beta quantiles on a grid.
+
+        Args:
+            levels (Sequence[float]): Quantile levels, in (0, 1).
+            cap (float): Largest alpha / beta on the grid, the migration params cap.
+            num_nodes (int): Grid nodes per axis.
+            min_param (float): Smallest alpha / beta on the grid.
+        """
+        self.levels: np.ndarray = _as_levels(levels)
+
+        self._log_min: float = np.log(min_param)
+        self._log_max: float = np.log(cap)
+        self._step: float = (self._log_max - self._log_min) / (num_nodes - 1)
+        self._num_nodes: int = num_nodes
+
+        nodes = np.exp(np.linspace(self._log_min, self._log_max, num_nodes))
+        a, b = np.meshgrid(nodes, nodes, indexing="ij")
+        # (levels, alpha node, beta node)
+        self._table: np.ndarray = betaincinv(a[None], b[None], self.levels[:, None, None])
+
+    def quantiles(self, alpha: np.ndarray, beta: np.ndarray) -> np.ndarray:
+        """Interpolated quantiles, shape (len(levels), len(alpha))."""
+        alpha, beta = _as_params(alpha, beta)
+
+        last = self._num_nodes - 1
+        # off grid points (0 or negative params) get garbage in
+        # the interpolation, take clips their indices, and they are overwritten below.
+        with np.errstate(divide="ignore", invalid="ignore"):
+            x = (np.log(alpha) - self._log_min) / self._step
+            y = (np.log(beta) - self._log_min) / self._step
+            on_grid = (x >= 0) & (x <= last) & (y >= 0) & (y <= last)
+
+            # cell corners and weights
+            i = np.minimum(x.astype(np.intp), last - 1)
+            j = np.minimum(y.astype(np.intp), last - 1)
+            wx = x - i
+            wy = y - j
+            w00 = (1 - wx) * (1 - wy)
+            w10 = wx * (1 - wy)
+            w01 = (1 - wx) * wy
+            w11 = wx * wy
+
+            # np.take on a flat table is much faster than fancy indexing in 3d
+            k00 = i * self._num_nodes + j
+            k10 = k00 + self._num_nodes
+            out = np.empty((len(self.levels), len(alpha)))
+            for level_ix, table in enumerate(self._table.reshape(len(self.levels), -1)):
+                out[level_ix] = (
+                    np.take(table, k00, mode="clip") * w00
+                    + np.take(table, k10, mode="clip") * w10
+                    + np.take(table, k00 + 1, mode="clip") * w01
+                    + np.take(table, k10 + 1, mode="clip") * w11
+                )
+
+        if not on_grid.all():
+            off = ~on_grid
+            out[:, off] = _exact_quantiles(alpha[off], beta[off], self.levels)
+        return out
+
+
+@lru_cache(maxsize=8)
+def _default_table(levels: Tuple[float, ...], cap: float) -> BetaQuantileTable:
+    return BetaQuantileTable(levels=levels, cap=cap)
+
+
+def beta_quantiles(
+    alpha: np.ndarray,
+    beta: np.ndarray,
+    levels: Sequence[float] = (0.025, 0.975),
+    migration_params: MigrationParams = MIGRATION_PARAMS,
+    exact: bool = False,
+) -> np.ndarray:
+    """Quantiles of Beta(alpha, beta) for many obligors at once.
+
+    Args:
+        alpha (np.ndarray): Good credit params.
+        beta (np.ndarray): Bad credit params.
+        levels (Sequence[float]): Quantile levels, in (0, 1).
+        migration_params (MigrationParams): Its cap bounds the precomputed grid.
+        exact (bool): Skip the approximate grid and invert the incomplete beta directly.
+
+    Returns:
+        np.ndarray: Quantiles, shape (len(levels), len(alpha)).
+
+    Raises:
+        ValueError: If any alpha or beta is nan or infinite, or a level is outside (0, 1).
+    """
+    alpha, beta = _as_params(alpha, beta)
+    levels = _as_levels(levels)
+    if exact:
+        return _exact_quantiles(alpha, beta, levels)
+    # rounded so levels computed from the same mass share a cached table
+    table = _default_table(tuple(round(float(level), 12) for level in levels), float(migration_params.cap))
+    return table.quantiles(alpha, beta)
+
+
+def batch_conf_interval(
+    alpha: np.ndarray,
+    beta: np.ndarray,
+    mass: float = 0.95,
+    migration_params: MigrationParams = MIGRATION_PARAMS,
+    exact: bool = False,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Equal tailed credible interval as scores, the batch analogue of Obligor.get_conf_interval.
+
+    Args:
+        alpha (np.ndarray): Good credit params.
+        beta (np.ndarray): Bad credit params.
+        mass (float): Posterior mass inside the interval.
+        migration_params (MigrationParams): Its cap bounds the precomputed grid.
+        exact (bool): Skip the approximate grid, scores then match exact Beta quantiles.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: Lower and upper scores, 0-100.
+
+    Raises:
+        ValueError: If any alpha or beta is nan or infinite, or mass is outside (0, 1).
+    """
+    tail = (1 - mass) / 2
+    lower, upper = beta_quantiles(
+        alpha, beta, levels=(tail, 1 - tail), migration_params=migration_params, exact=exact
+    )
+    # np.rint rounds half to even, same as the round in Obligor._compute_score
+    return np.rint(100 * lower).astype(int), np.rint(100 * upper).astype(int)
@@ -9,16 +9,57 @@ Here we use USD.
 """
 
 
+from typing import List, Tuple
+
 import pandas as pd
-from lib.obligor_v2 import Obligor  # v2 is for runnning live (not sim) data
+from lib.obligor_v2 import BaseObligor, Obligor  # v2 is for runnning live (not sim) data
+from lib.obligor_score_only import ScoreOnlyObligor
+from lib.obligor_sensitivity import SensitivityObligor
 from lib.credit_migration_schema import MigrationParams
 from lib.default_migration_params import MIGRATION_PARAMS
 
-def compute_score(input_data: dict, start_alpha: int, start_beta: int, migration_params: MigrationParams = MIGRATION_PARAMS,protocol_name:str="")->int:
+def apply_event(obl: BaseObligor, event: dict, protocol_name: str = "") -> None:
+    """Applies a single raw event to an obligor.
+
+    Args:
+        obl (BaseObligor): Obligor (or score only obligor) to update.
+        event (dict): Event record (or dataframe row) with type, amount and symbol.
+        protocol_name (str): Protocol the event came from.
+    """
+    amount: float = float(event["amount"])
+    symbol: str = event["symbol"]
+    if event["type"] == 'borrow':
+
+        obl.add_borrow(amount=amount, borrow_name=symbol, protocol_name=protocol_name)
+    elif event["type"] == 'deposit':
+        # compute price of asset
+        obl.add_collateral(amt_colat_to_add=amount,collat_name=symbol, protocol_name=protocol_name)
+        # note, asset price is hard coded as 1 until we get amount USD in query.
+    elif event["type"] == 'repay':
+        obl.add_repay(amount=amount, borrow_name=symbol, protocol_name = protocol_name, loan_num=0)
+    elif event['type'] == 'withdraw':
+        obl.withdraw_collateral(withdraw_amt=amount,collat_name=symbol,protocol_name=protocol_name,loan_num=0)
+        # note, asset price is hard coded as 1 until we get amount USD in query.
+    elif event["type"] == 'liquidation':
+        #if protocol is aave, liquidation token starts with a then is CollatBORROW
+        liq_symbol = symbol
+        if 'aave_v3' in protocol_name:
+            first_upper = 2
+            while first_upper < len(liq_symbol) and (not liq_symbol[first_upper].isupper()):
+                first_upper += 1
+            liq_symbol = liq_symbol[1:first_upper].upper()
+        obl.add_liquidation(amt_to_liq=amount, collat_name=liq_symbol, protocol_name=protocol_name, loan_num=0)
+    else:
+        pass
+
+
+def compute_score(input_data: dict, start_alpha: int, start_beta: int, migration_params: MigrationParams = MIGRATION_PARAMS,protocol_name:str="", score_only: bool = False, sensitivities: bool = False)->int:
     """Computes the score given input data.
 
     Args:
         input_data (pd.DataFrame): Input data, json.
+        score_only (bool): Replay with the minimal state ScoreOnlyObligor, same score, no loans kept.
+        sensitivities (bool): Replay with SensitivityObligor, score only plus param gradients.
 
     Returns:
         int: Janka Score, 0-100.
@@ -29,40 +70,38 @@ def compute_score(input_data: dict, start_alpha: int, start_beta: int, migration
     dat["amount"] = dat["amount"].astype(float)
 
     # Instantiate obligor class
-    obl: Obligor = Obligor(alpha=start_alpha, beta=start_beta, migration_params=migration_params)
+    if sensitivities:
+        obligor_cls = SensitivityObligor
+    elif score_only:
+        obligor_cls = ScoreOnlyObligor
+    else:
+        obligor_cls = Obligor
+    obl: BaseObligor = obligor_cls(alpha=start_alpha, beta=start_beta, migration_params=migration_params)
 
     # run thru the events.
     for ix, event in dat.iterrows():
-        if event["type"] == 'borrow':
-
-            obl.add_borrow(amount=event.amount, borrow_name=event.symbol, protocol_name=protocol_name)
-        elif event["type"] == 'deposit':
-            # compute price of asset
-            obl.add_collateral(amt_colat_to_add=event.amount,collat_name=event.symbol, protocol_name=protocol_name)
-            # note, asset price is hard coded as 1 until we get amount USD in query.
-        elif event["type"] == 'repay':
-            obl.add_repay(amount=event.amount, borrow_name=event.symbol, protocol_name = protocol_name, loan_num=0)
-        elif event['type'] == 'withdraw':
-            obl.withdraw_collateral(withdraw_amt=event.amount,collat_name=event.symbol,protocol_name=protocol_name,loan_num=0)
-            # note, asset price is hard coded as 1 until we get amount USD in query.
-        elif event["type"] == 'liquidation':
-            #if protocol is aave, liquidation token starts with a then is CollatBORROW
-            liq_symbol = event.symbol
-            if 'aave_v3' in protocol_name:
-                first_upper = 2
-                while first_upper < len(liq_symbol) and (not liq_symbol[first_upper].isupper()):
-                    first_upper += 1
-                liq_symbol = liq_symbol[1:first_upper].upper()
-            obl.add_liquidation(amt_to_liq=event.amount, collat_name=liq_symbol, protocol_name=protocol_name, loan_num=0)
-        else:
-            pass
+        apply_event(obl=obl, event=event, protocol_name=protocol_name)
         #print(ix, event.symbol, event.type, obl.get_score())
 
     return obl
 
 
+def compute_score_and_grad(input_data: dict, start_alpha: int, start_beta: int, migration_params: MigrationParams = MIGRATION_PARAMS, protocol_name: str = "") -> Tuple[int, List[float]]:
+    """Computes the score and its gradient w.r.t. the migration params in one replay.
 
+    Args:
+        input_data (pd.DataFrame): Input data, json.
 
-        
-
-
+    Returns:
+        Tuple[int, List[float]]: Janka Score, 0-100, and gradient of the unrounded
+            score in SENSITIVITY_PARAMS order (c0, xi0, c1, xi1, c2, xi2, cap).
+    """
+    obl: SensitivityObligor = compute_score(
+        input_data=input_data,
+        start_alpha=start_alpha,
+        start_beta=start_beta,
+        migration_params=migration_params,
+        protocol_name=protocol_name,
+        sensitivities=True,
+    )
+    return obl.get_score(), obl.get_score_grad()
@@ -0,0 +1,281 @@
+"""Module for fetching lending events from Messari's AAVE V3 subgraph.
+
+Pages for many wallets are requested concurrently over a small pool of
+keep-alive connections. Each (wallet, event type) pair is paged by id
+cursor, so an interrupted run can be resumed from a checkpoint file.
+
+Records come back in the same shape as the example jsons, ready for
+compute_score.
+"""
+
+import asyncio
+import http.client
+import json
+import os
+import random
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+
+DEFAULT_SUBGRAPH_URL = "https://api.thegraph.com/subgraphs/name/messari/aave-v3-ethereum"
+
+# subgraph entity -> (event type used by compute_score, account field)
+EVENT_ENTITIES: Dict[str, Tuple[str, str]] = {
+    "deposits": ("deposit", "account"),
+    "withdraws": ("withdraw", "account"),
+    "borrows": ("borrow", "account"),
+    "repays": ("repay", "account"),
+    "liquidates": ("liquidation", "liquidatee"),
+}
+
+EVENTS_QUERY = """query {entity}($account: String!, $first: Int!, $cursor: String!) {{
+  {entity}(first: $first, orderBy: id, orderDirection: asc, where: {{{account_field}: $account, id_gt: $cursor}}) {{
+    id
+    amount
+    amountUSD
+    timestamp
+    logIndex
+    asset {{
+      symbol
+      decimals
+    }}
+  }}
+}}"""
+
+# retry on throttling and server side errors. a 200 with graphql errors is a
+# bad query or schema mismatch, retrying won't fix it.
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+
+class FetchError(Exception):
+    """Raised when a page can't be fetched after all retries."""
+
+
+def to_record(raw: dict, event_type: str) -> dict:
+    """Flatten a subgraph event into the record shape compute_score consumes."""
+    asset = raw.get("asset") or {}
+    symbol = asset.get("symbol", raw.get("symbol"))
+    amount = float(raw["amount"])
+    decimals = asset.get("decimals")
+    if decimals is not None:
+        amount = amount / 10 ** int(decimals)
+    return {
+        "amount": amount,
+        "amountUSD": float(raw["amountUSD"]),
+        "timestamp": int(raw["timestamp"]),
+        "logIndex": int(raw["logIndex"]),
+        "symbol": symbol,
+        "type": event_type,
+    }
+
+
+class _ConnectionPool:
+    """Fixed size pool of keep-alive connections to one host.
+
+    Requests block in http.client, so each runs on a thread of the pool's
+    own executor, sized to match. The loop's default executor is capped at
+    min(32, cpu + 4) threads and would silently bound concurrency below size.
+    """
+
+    def __init__(self, url: str, size: int, timeout: float) -> None:
+        parts = urlsplit(url)
+        self._https: bool = parts.scheme == "https"
+        self._host: str = parts.hostname
+        self._port: Optional[int] = parts.port
+        self._path: str = parts.path or "/"
+        self._timeout: float = timeout
+        self._executor: ThreadPoolExecutor = ThreadPoolExecutor(max_workers=size, thread_name_prefix="fetch_events")
+        self._idle: asyncio.Queue = asyncio.Queue()
+        for _ in range(size):
+            self._idle.put_nowait(None)  # connections are opened lazily
+
+    def _connect(self) -> http.client.HTTPConnection:
+        conn_cls = http.client.HTTPSConnection if self._https else http.client.HTTPConnection
+        return conn_cls(self._host, self._port, timeout=self._timeout)
+
+    def _post(self, conn: http.client.HTTPConnection, body: bytes) -> Tuple[int, bytes]:
+        conn.request("POST", self._path, body=body, headers={"Content-Type": "application/json"})
+        resp = conn.getresponse()
+        return resp.status, resp.read()
+
+    async def post(self, payload: dict) -> Tuple[int, bytes]:
+        """POST json, blocking on a free connection (this is what bounds concurrency)."""
+        conn = await self._idle.get()
+        try:
+            if conn is None:
+                conn = self._connect()
+            loop = asyncio.get_running_loop()
+            status, body = await loop.run_in_executor(self._executor, self._post, conn, json.dumps(payload).encode())
+        except BaseException:
+            # connection state is unknown, drop it and open a fresh one next time.
+            if conn is not None:
+                conn.close()
+            self._idle.put_nowait(None)
+            raise
+        self._idle.put_nowait(conn)
+        return status, body
+
+    async def close(self) -> None:
+        while not self._idle.empty():
+            conn = self._idle.get_nowait()
+            if conn is not None:
+                conn.close()
+        # cancelled requests may still hold a thread, don't block the loop on them
+        self._executor.shutdown(wait=False)
+
+
+class EventFetcher:
+    def __init__(
+        self,
+        url: str = DEFAULT_SUBGRAPH_URL,
+        page_size: int = 1000,
+        max_concurrency: int = 8,
+        max_retries: int = 5,
+        backoff_base: float = 0.5,
+        backoff_max: float = 30.0,
+        timeout: float = 30.0,
+        checkpoint_path: Optional[str] = None,
+    ) -> None:
+        """Create event fetcher.
+
+        Args:
+            url (str): GraphQL endpoint of the subgraph.
+            page_size (int): Events requested per page.
+            max_concurrency (int): Max in flight requests, also the connection pool size.
+            max_retries (int): Retries per page before giving up.
+            backoff_base (float): First retry delay in seconds, doubled each retry.
+            backoff_max (float): Cap on a single retry delay in seconds.
+            timeout (float): Socket timeout in seconds.
+            checkpoint_path (str): Optional jsonl file to log finished pages to, used to resume.
+        """
+        self._url: str = url
+        self._page_size: int = page_size
+        self._max_concurrency: int = max_concurrency
+        self._max_retries: int = max_retries
+        self._backoff_base: float = backoff_base
+        self._backoff_max: float = backoff_max
+        self._timeout: float = timeout
+        self._checkpoint_path: Optional[str] = checkpoint_path
+
+        # wallet -> records, (wallet, entity) -> cursor or None once exhausted.
+        # reset by every fetch call, the checkpoint is what carries state across runs.
+        self._records: Dict[str, List[dict]] = {}
+        self._cursors: Dict[Tuple[str, str], Optional[str]] = {}
+
+    def _load_checkpoint(self) -> None:
+        """Replay the checkpoint log, restoring records and cursors."""
+        if self._checkpoint_path is None or not os.path.exists(self._checkpoint_path):
+            return
+        valid_bytes = 0
+        with open(self._checkpoint_path, "rb") as f:
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break  # torn last line from an interrupted run
+                page = json.loads(line)
+                self._records.setdefault(page["wallet"], []).extend(page["records"])
+                self._cursors[(page["wallet"], page["entity"])] = page["cursor"]
+                valid_bytes += len(line)
+
+        # drop the torn tail so new pages aren't appended onto it
+        with open(self._checkpoint_path, "r+b") as f:
+            f.truncate(valid_bytes)
+
+    def _write_checkpoint(self, wallet: str, entity: str, cursor: Optional[str], records: List[dict]) -> None:
+        if self._checkpoint_path is None:
+            return
+        line = json.dumps({"wallet": wallet, "entity": entity, "cursor": cursor, "records": records})
+        with open(self._checkpoint_path, "a") as f:
+            f.write(line + "\n")
+
+    async def _fetch_page(self, pool: _ConnectionPool, wallet: str, entity: str, cursor: str) -> List[dict]:
+        """Fetch one page, retrying with jittered exponential backoff."""
+        _, account_field = EVENT_ENTITIES[entity]
+        payload = {
+            "operationName": entity,
+            "query": EVENTS_QUERY.format(entity=entity, account_field=account_field),
+            "variables": {"account": wallet, "first": self._page_size, "cursor": cursor},
+        }
+        for attempt in range(self._max_retries + 1):
+            try:
+                status, body = await pool.post(payload)
+                if status == 200:
+                    resp = json.loads(body)
+                    if resp.get("errors"):
+                        raise FetchError("graphql errors fetching {0} for {1}: {2}".format(entity, wallet, resp["errors"]))
+                    return resp["data"][entity]
+                elif status in RETRY_STATUSES:
+                    err = "status {0}".format(status)
+                else:
+                    raise FetchError("status {0} fetching {1} for {2}".format(status, entity, wallet))
+            except (OSError, http.client.HTTPException, json.JSONDecodeError) as e:
+                err = repr(e)
+
+            if attempt < self._max_retries:
+                delay = min(self._backoff_base * 2 ** attempt, self._backoff_max)
+                await asyncio.sleep(delay * random.uniform(0.5, 1.0))
+
+        raise FetchError("giving up on {0} for {1}: {2}".format(entity, wallet, err))
+
+    async def _fetch_entity(self, pool: _ConnectionPool, wallet: str, entity: str) -> None:
+        """Page through one (wallet, entity) until exhausted."""
+        event_type, _ = EVENT_ENTITIES[entity]
+        key = (wallet, entity)
+        cursor = self._cursors.get(key, "")
+        while cursor is not None:
+            page = await self._fetch_page(pool, wallet, entity, cursor)
+            records = [to_record(raw, event_type) for raw in page]
+            cursor = page[-1]["id"] if len(page) == self._page_size else None
+
+            self._records.setdefault(wallet, []).extend(records)
+            self._cursors[key] = cursor
+            self._write_checkpoint(wallet, entity, cursor, records)
+
+    async def fetch(self, wallets: Iterable[str]) -> Dict[str, List[dict]]:
+        """Fetch every event for the wallets.
+
+        Args:
+            wallets (Iterable[str]): Wallet addresses.
+
+        Returns:
+            Dict[str, List[dict]]: wallet -> records sorted by (timestamp, logIndex).
+        """
+        wallets = [wallet.lower() for wallet in wallets]
+        self._records = {}
+        self._cursors = {}
+        self._load_checkpoint()
+
+        work: asyncio.Queue = asyncio.Queue()
+        for wallet in wallets:
+            self._records.setdefault(wallet, [])
+            for entity in EVENT_ENTITIES:
+                if self._cursors.get((wallet, entity), "") is not None:
+                    work.put_nowait((wallet, entity))
+
+        pool = _ConnectionPool(self._url, size=self._max_concurrency, timeout=self._timeout)
+
+        async def worker() -> None:
+            while not work.empty():
+                wallet, entity = work.get_nowait()
+                await self._fetch_entity(pool, wallet, entity)
+
+        # each worker owns one (wallet, entity) chain at a time,
+        # the pool bounds how many requests are actually in flight.
+        workers = [asyncio.ensure_future(worker()) for _ in range(self._max_concurrency)]
+        try:
+            await asyncio.gather(*workers)
+        finally:
+            for task in workers:
+                task.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+            await pool.close()
+
+        return {
+            wallet: sorted(self._records[wallet], key=lambda rec: (rec["timestamp"], rec["logIndex"]))
+            for wallet in wallets
+        }
+
+
+def fetch_events(wallets: Iterable[str], **kwargs) -> Dict[str, List[dict]]:
+    """Blocking wrapper around EventFetcher.fetch, kwargs go to EventFetcher."""
+    return asyncio.run(EventFetcher(**kwargs).fetch(wallets))
@@ -0,0 +1,149 @@
+"""Local stand-in for the AAVE V3 subgraph, serving the example jsons.
+
+Answers the paged queries sent by lib.fetch_events, so fetching can be
+tested offline for both correctness and throughput. The wallet address is
+the json file name. Amounts are served already scaled (no decimals), so
+fetched records round trip exactly.
+
+Run standalone with:
+    python -m lib.fixture_server [json_dir] [port]
+"""
+
+import json
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional
+
+from lib.fetch_events import EVENT_ENTITIES
+
+DEFAULT_JSON_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "..", "example_jsons")
+
+
+def _event_id(record: dict) -> str:
+    """Zero padded so string order is (timestamp, logIndex) order, like a cursor."""
+    return "{0:012d}-{1:08d}".format(int(record["timestamp"]), int(record["logIndex"]))
+
+
+def load_fixtures(json_dir: str = DEFAULT_JSON_DIR) -> Dict[str, Dict[str, List[dict]]]:
+    """Load example jsons into wallet -> entity -> subgraph style events, sorted by id."""
+    type_to_entity = {event_type: entity for entity, (event_type, _) in EVENT_ENTITIES.items()}
+    fixtures: Dict[str, Dict[str, List[dict]]] = {}
+    for file_name in sorted(os.listdir(json_dir)):
+        if not file_name.endswith(".json"):
+            continue
+        wallet = file_name[: -len(".json")].lower()
+        with open(os.path.join(json_dir, file_name), "r") as f:
+            records = json.load(f)
+
+        by_entity: Dict[str, List[dict]] = {entity: [] for entity in EVENT_ENTITIES}
+        for record in records:
+            by_entity[type_to_entity[record["type"]]].append(
+                {
+                    "id": _event_id(record),
+                    "amount": record["amount"],
+                    "amountUSD": record["amountUSD"],
+                    "timestamp": record["timestamp"],
+                    "logIndex": record["logIndex"],
+                    "asset": {"symbol": record["symbol"]},
+                }
+            )
+        for events in by_entity.values():
+            events.sort(key=lambda event: event["id"])
+        fixtures[wallet] = by_entity
+    return fixtures
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, so client pooling is exercised
+    # headers and body go out in separate writes, without TCP_NODELAY
+    # nagle + delayed ack add ~40ms to every response.
+    disable_nagle_algorithm = True
+    server: "FixtureServer"
+
+    def do_POST(self) -> None:
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        try:
+            payload = json.loads(body)
+            entity: str = payload["operationName"]
+            variables: dict = payload["variables"]
+            events = self.server.fixtures.get(variables["account"].lower(), {}).get(entity, [])
+        except (ValueError, KeyError, AttributeError):
+            self._send(400, {"errors": [{"message": "bad request"}]})
+            return
+
+        if self.server.latency > 0:
+            time.sleep(self.server.latency)
+
+        cursor: str = variables.get("cursor", "")
+        page = [event for event in events if event["id"] > cursor][: int(variables["first"])]
+        self._send(200, {"data": {entity: page}})
+
+    def _send(self, status: int, payload: dict) -> None:
+        out = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(out)))
+        self.end_headers()
+        self.wfile.write(out)
+
+    def log_message(self, format: str, *args) -> None:
+        pass  # quiet
+
+
+class FixtureServer(ThreadingHTTPServer):
+    daemon_threads = True
+    # the default backlog of 5 drops connects past it, and the client's
+    # SYN retry then stalls those requests by a second or more.
+    request_queue_size = 128
+
+    def __init__(self, json_dir: str = DEFAULT_JSON_DIR, host: str = "127.0.0.1", port: int = 0, latency: float = 0.0) -> None:
+        """Create fixture server, port 0 picks a free port.
+
+        Args:
+            json_dir (str): Directory of example jsons, one per wallet.
+            host (str): Interface to bind.
+            port (int): Port to bind.
+            latency (float): Seconds to sleep per request, to mimic a remote endpoint.
+        """
+        super().__init__((host, port), _Handler)
+        self.fixtures: Dict[str, Dict[str, List[dict]]] = load_fixtures(json_dir)
+        self.latency: float = latency
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return "http://{0}:{1}/".format(host, port)
+
+    @property
+    def wallets(self) -> List[str]:
+        return list(self.fixtures.keys())
+
+    def start(self) -> "FixtureServer":
+        """Serve from a background thread."""
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.shutdown()
+        self.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+    def __enter__(self) -> "FixtureServer":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+
+if __name__ == "__main__":
+    json_dir = sys.argv[1] if len(sys.argv) > 1 else DEFAULT_JSON_DIR
+    port = int(sys.argv[2]) if len(sys.argv) > 2 else 8000
+    server = FixtureServer(json_dir=json_dir, port=port)
+    print("serving {0} wallets at {1}".format(len(server.wallets), server.url))
+    server.serve_forever()
@@ -0,0 +1,157 @@
+"""Registry of obligors keyed by wallet address.
+
+Obligors are split across shards by a stable hash of the address, and each
+shard has its own lock. Events for wallets on different shards can be applied
+from several threads (or asyncio tasks) without serializing on one global lock.
+
+Events for a given wallet still need to be applied in (timestamp, logIndex)
+order, same as compute_score does.
+"""
+
+import threading
+from typing import Dict, Iterable, List, NamedTuple, Optional
+from zlib import crc32
+
+from lib.compute_score import apply_event
+from lib.obligor_v2 import BaseObligor, Obligor
+from lib.obligor_score_only import ScoreOnlyObligor
+from lib.credit_migration_schema import MigrationParams
+from lib.default_migration_params import MIGRATION_PARAMS
+
+
+class ObligorSnapshot(NamedTuple):
+    """Immutable view of an obligor's credit parameters."""
+
+    alpha: float
+    beta: float
+    score: int
+
+
+class _Shard:
+    """Obligors owned by one lock."""
+
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        self.obligors: Dict[str, BaseObligor] = {}
+
+        # published after every write, readers never take the lock.
+        # values are immutable tuples and the dict is only ever assigned
+        # into, so a read sees either the old or new snapshot.
+        self.snapshots: Dict[str, ObligorSnapshot] = {}
+
+
+class ObligorRegistry:
+    def __init__(
+        self,
+        start_alpha: int,
+        start_beta: int,
+        migration_params: MigrationParams = MIGRATION_PARAMS,
+        protocol_name: str = "",
+        num_shards: int = 16,
+        score_only: bool = False,
+    ) -> None:
+        """Create obligor registry.
+
+        Args:
+            start_alpha (int): Initial alpha for newly seen wallets.
+            start_beta (int): Initial beta for newly seen wallets.
+            migration_params (MigrationParams): Params passed to every obligor.
+            protocol_name (str): Protocol the events come from.
+            num_shards (int): Number of independently locked shards.
+            score_only (bool): Keep ScoreOnlyObligors, same scores but no loans kept.
+        """
+        if num_shards < 1:
+            raise ValueError("num_shards must be at least 1")
+        if start_alpha + start_beta <= 0:
+            # the score is alpha / (alpha + beta), published after every write
+            raise ValueError("start_alpha + start_beta must be positive")
+
+        self._start_alpha: int = start_alpha
+        self._start_beta: int = start_beta
+        self._migration_params: MigrationParams = migration_params
+        self._protocol_name: str = protocol_name
+        self._obligor_cls = ScoreOnlyObligor if score_only else Obligor
+        self._shards: List[_Shard] = [_Shard() for _ in range(num_shards)]
+
+    @staticmethod
+    def _normalize(address: str) -> str:
+        return address.lower()
+
+    def shard_index(self, address: str) -> int:
+        """Shard owning the address, stable across processes (unlike hash())."""
+        return crc32(self._normalize(address).encode()) % len(self._shards)
+
+    def _shard(self, address: str) -> _Shard:
+        return self._shards[self.shard_index(address)]
+
+    def _fetch_obligor(self, shard: _Shard, address: str) -> BaseObligor:
+        """Get the obligor, caller must hold the shard lock."""
+        if address not in shard.obligors:
+            shard.obligors[address] = self._obligor_cls(
+                alpha=self._start_alpha,
+                beta=self._start_beta,
+                migration_params=self._migration_params,
+            )
+        return shard.obligors[address]
+
+    @staticmethod
+    def _publish(shard: _Shard, address: str, obl: BaseObligor) -> None:
+        shard.snapshots[address] = ObligorSnapshot(
+            alpha=obl._alpha, beta=obl._beta, score=obl.get_score()
+        )
+
+    def apply_event(self, address: str, event: dict) -> None:
+        """Apply a single raw event to the wallet's obligor."""
+        self.apply_events(address=address, events=[event])
+
+    def apply_events(self, address: str, events: Iterable[dict]) -> None:
+        """Apply a batch of raw events for one wallet, taking the shard lock once."""
+        address = self._normalize(address)
+        shard = self._shard(address)
+        with shard.lock:
+            obl = self._fetch_obligor(shard, address)
+            try:
+                for event in events:
+                    apply_event(obl=obl, event=event, protocol_name=self._protocol_name)
+            finally:
+                # events applied before a failure still changed the obligor,
+                # keep the snapshot in step with it.
+                self._publish(shard, address, obl)
+
+    def partition(self, events: Iterable[dict], address_key: str = "address") -> List[List[dict]]:
+        """Split events by owning shard, preserving order within each shard.
+
+        Handing each partition to a single worker means workers never
+        contend for the same shard lock.
+        """
+        partitions: List[List[dict]] = [[] for _ in self._shards]
+        for event in events:
+            partitions[self.shard_index(event[address_key])].append(event)
+        return partitions
+
+    def get_obligor(self, address: str) -> Optional[BaseObligor]:
+        """Get the live obligor, only safe to mutate while no writers are running."""
+        address = self._normalize(address)
+        return self._shard(address).obligors.get(address, None)
+
+    def get_snapshot(self, address: str) -> Optional[ObligorSnapshot]:
+        """Latest published alpha, beta and score, never blocks writers."""
+        address = self._normalize(address)
+        return self._shard(address).snapshots.get(address, None)
+
+    def snapshot(self) -> Dict[str, ObligorSnapshot]:
+        """Latest published snapshot of every wallet, never blocks writers.
+
+        Each shard is copied atomically, but shards are copied one after
+        another, so the result is not a single point in time across shards.
+        """
+        out: Dict[str, ObligorSnapshot] = {}
+        for shard in self._shards:
+            out.update(shard.snapshots.copy())
+        return out
+
+    def __len__(self) -> int:
+        return sum(len(shard.snapshots) for shard in self._shards)
+
+    def __contains__(self, address: str) -> bool:
+        return self.get_snapshot(address) is not None
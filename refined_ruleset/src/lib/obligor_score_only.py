@@ -0,0 +1,139 @@
+"""
+Score only obligor, for when only get_score / get_conf_interval are needed.
+
+Keeps just the state that decides which _inc_* fires: outstanding amount per
+borrowed asset (repay half threshold), collateral amount per asset (deposit
+threshold) and whether the loan is outstanding. Amounts live in flat arrays
+indexed by asset, no Loan objects, status strings or settled loan bookkeeping.
+
+Tracks a single loan, like compute_score which runs one protocol per obligor.
+Scores are identical to obligor_v2.Obligor on the same events.
+"""
+
+from array import array
+from typing import Dict
+
+from lib.obligor_v2 import BaseObligor
+from lib.credit_migration_schema import MigrationParams
+from lib.default_migration_params import MIGRATION_PARAMS
+
+
+class ScoreOnlyObligor(BaseObligor):
+    def __init__(
+        self,
+        alpha: int,
+        beta: int,
+        migration_params: MigrationParams = MIGRATION_PARAMS,
+    ) -> None:
+        """Create score only obligor class
+
+        Args:
+            alpha (int): Initial value for good credit parameter.
+            beta (int): Initial value for bad credit parameter.
+        """
+        super().__init__(alpha=alpha, beta=beta, migration_params=migration_params)
+
+        # asset name -> index into the amount arrays, in first seen order
+        # so sums run in the same order as the dicts in obligor_v2.
+        self._borrow_ix: Dict[str, int] = {}
+        self._outstanding: array = array("d")
+        self._collat_ix: Dict[str, int] = {}
+        self._collat: array = array("d")
+
+        self._is_outstanding: bool = True
+
+    def _borrow_index(self, borrow_name: str) -> int:
+        ix = self._borrow_ix.get(borrow_name)
+        if ix is None:
+            ix = self._borrow_ix[borrow_name] = len(self._outstanding)
+            self._outstanding.append(0.0)
+        return ix
+
+    def _collat_index(self, collat_name: str) -> int:
+        ix = self._collat_ix.get(collat_name)
+        if ix is None:
+            ix = self._collat_ix[collat_name] = len(self._collat)
+            self._collat.append(0.0)
+        return ix
+
+    def add_borrow(
+        self,
+        amount: float,
+        borrow_name: str,
+        protocol_name: str = "",
+    ) -> None:
+        """Add borrow to borrower."""
+        self._outstanding[self._borrow_index(borrow_name)] += amount
+        self._is_outstanding = True
+        self._inc_origination()
+
+    def add_repay(
+        self,
+        amount: float,
+        borrow_name: str,
+        protocol_name: str = "",
+        loan_num: int = 0,
+    ) -> bool:
+        if not self._is_outstanding:
+            return False  # nothing to reprocess.
+
+        ix = self._borrow_index(borrow_name)
+        original_amount = self._outstanding[ix]
+        amount_remaining = original_amount - amount
+        self._outstanding[ix] = amount_remaining
+
+        # give repay benefit if at least half as been returned
+        if amount_remaining < 0.5 * original_amount:
+            self._inc_repay()
+
+        if amount_remaining <= 0:
+            # settle loan
+            self._is_outstanding = sum(self._outstanding) > 0
+
+        return True
+
+    def add_collateral(
+        self,
+        amt_colat_to_add: float,
+        collat_name: str,
+        protocol_name: str = "",
+        loan_num: int = 0,
+    ) -> None:
+        """Add collateral, awards repay benefit for substantial collateral against debt."""
+        ix = self._collat_index(collat_name)
+        original_collat_amt = self._collat[ix]
+        self._collat[ix] = original_collat_amt + amt_colat_to_add
+
+        if amt_colat_to_add > 0.5 * original_collat_amt:
+            if sum(self._outstanding) > 0:
+                self._inc_repay()
+
+    def add_liquidation(
+        self,
+        amt_to_liq: float,
+        collat_name: str,
+        protocol_name: str = "",
+        loan_num: int = 0,
+    ):
+        # aave liquidates aEth[...], match on the underlying collateral name
+        if "aave" in protocol_name:
+            for name, ix in self._collat_ix.items():
+                if collat_name in name:
+                    self._collat[ix] -= amt_to_liq
+                    self._inc_liquidation()
+                    return True
+            raise Exception("Can't liqudiate " + collat_name)
+        else:
+            self._collat[self._collat_ix[collat_name]] -= amt_to_liq
+            self._inc_liquidation()
+
+    def withdraw_collateral(
+        self,
+        withdraw_amt: float,
+        collat_name: str,
+        protocol_name: str = "",
+        loan_num: int = 0,
+    ) -> None:
+        """Remove collateral from loan."""
+        ix = self._collat_ix[collat_name]
+        self._collat[ix] = max(self._collat[ix] - withdraw_amt, 0)
@@ -0,0 +1,123 @@
+"""
+Score only obligor that also carries parameter sensitivities.
+
+Forward mode differentiation: alongside alpha and beta, keeps their
+derivatives with respect to every migration param, updated by each _inc_*
+and by the piecewise _stickness cap. One replay gives the score and its
+gradient, instead of one replay per param for finite differences.
+
+Which _inc_* fires only depends on event amounts, never on the params, so
+the gradient is exact wherever the stickness branches don't flip.
+"""
+
+from math import log
+from typing import List
+
+from lib.obligor_score_only import ScoreOnlyObligor
+from lib.credit_migration_schema import MigrationParams
+from lib.default_migration_params import MIGRATION_PARAMS
+
+# gradient order, same as the MigrationParams fields
+SENSITIVITY_PARAMS = ("c0", "xi0", "c1", "xi1", "c2", "xi2", "cap")
+_PARAM_IX = {name: ix for ix, name in enumerate(SENSITIVITY_PARAMS)}
+
+
+class SensitivityObligor(ScoreOnlyObligor):
+    def __init__(
+        self,
+        alpha: int,
+        beta: int,
+        migration_params: MigrationParams = MIGRATION_PARAMS,
+    ) -> None:
+        """Create sensitivity obligor class
+
+        Args:
+            alpha (int): Initial value for good credit parameter.
+            beta (int): Initial value for bad credit parameter.
+        """
+        super().__init__(alpha=alpha, beta=beta, migration_params=migration_params)
+
+        # starting alpha / beta are fixed, so don't depend on the params
+        self._dalpha: List[float] = [0.0] * len(SENSITIVITY_PARAMS)
+        self._dbeta: List[float] = [0.0] * len(SENSITIVITY_PARAMS)
+
+    def _increment_grad(self, c_name: str, xi_name: str) -> List[float]:
+        """Derivative of c * log(1 + xi / (alpha + beta)), at the current state."""
+        c = getattr(self, "_" + c_name)
+        xi = getattr(self, "_" + xi_name)
+        sum_ab = self._sum_ab()
+        ratio = xi / sum_ab
+        scale = c / (1 + ratio)
+        grad = [-scale * ratio / sum_ab * (da + db) for da, db in zip(self._dalpha, self._dbeta)]
+        grad[_PARAM_IX[c_name]] += log(1 + ratio)
+        grad[_PARAM_IX[xi_name]] += scale / sum_ab
+        return grad
+
+    def _inc_origination(self) -> None:
+        """Increments beta for origination."""
+        grad = self._increment_grad("c0", "xi0")
+        sum_ab: int = self._sum_ab()
+        self._beta = self._beta + self._c0 * log(1 + self._xi0 / sum_ab)
+        self._dbeta = [d + g for d, g in zip(self._dbeta, grad)]
+        self._stickness()
+
+    def _inc_repay(self) -> None:
+        """Increments alpha for repayment."""
+        grad = self._increment_grad("c1", "xi1")
+        sum_ab: int = self._sum_ab()
+        self._alpha = self._alpha + self._c1 * log(1 + self._xi1 / sum_ab)
+        self._dalpha = [d + g for d, g in zip(self._dalpha, grad)]
+        self._stickness()
+
+    def _inc_liquidation(self) -> None:
+        """Increments liquidation."""
+        grad = self._increment_grad("c2", "xi2")
+        sum_ab: int = self._sum_ab()
+        self._beta = self._beta + self._c2 * log(1 + self._xi2 / sum_ab)
+        self._dbeta = [d + g for d, g in zip(self._dbeta, grad)]
+        self._stickness()
+
+    def _cap_grad(self, value: float, grad: List[float], diff: float, ddiff: List[float]) -> List[float]:
+        """Derivative of min(max(value - 0.5 * diff, 0), cap), following the branch taken."""
+        shrunk = value - 0.5 * diff
+        if not shrunk >= 0:
+            return [0.0] * len(grad)
+        if shrunk <= self._sum_ab_cap:
+            return [d - 0.5 * dd for d, dd in zip(grad, ddiff)]
+        out = [0.0] * len(grad)
+        out[_PARAM_IX["cap"]] = 1.0
+        return out
+
+    def _stickness(self) -> None:
+        """Guide sum of alpha + beta."""
+        sumab = self._sum_ab()
+        diff = sumab - self._sum_ab_cap
+        if diff > 0:
+            # d(diff), cap enters with a minus sign
+            ddiff = [da + db for da, db in zip(self._dalpha, self._dbeta)]
+            ddiff[_PARAM_IX["cap"]] -= 1.0
+
+            self._dalpha = self._cap_grad(self._alpha, self._dalpha, diff, ddiff)
+            self._dbeta = self._cap_grad(self._beta, self._dbeta, diff, ddiff)
+
+        super()._stickness()
+
+    def get_alpha_grad(self) -> List[float]:
+        """d alpha / d params, in SENSITIVITY_PARAMS order."""
+        return list(self._dalpha)
+
+    def get_beta_grad(self) -> List[float]:
+        """d beta / d params, in SENSITIVITY_PARAMS order."""
+        return list(self._dbeta)
+
+    def get_proba_grad(self) -> List[float]:
+        """d proba / d params, in SENSITIVITY_PARAMS order."""
+        sum_ab = self._sum_ab()
+        return [
+            (self._beta * da - self._alpha * db) / sum_ab ** 2
+            for da, db in zip(self._dalpha, self._dbeta)
+        ]
+
+    def get_score_grad(self) -> List[float]:
+        """Gradient of the unrounded score (100 * proba), the rounded score is piecewise flat."""
+        return [100 * d for d in self.get_proba_grad()]
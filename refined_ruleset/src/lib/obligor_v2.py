@@ -41,14 +41,16 @@ class Loan:
         return self.collateral_amts.get(collat_name, 0)
 
 
-class Obligor:
+class BaseObligor:
+    """Scoring core shared by obligors, alpha / beta and the migration rules."""
+
     def __init__(
         self,
         alpha: int,
         beta: int,
         migration_params: MigrationParams = MIGRATION_PARAMS,
     ) -> None:
-        """Create obligor class
+        """Create base obligor class
 
         Args:
             alpha (int): Initial value for good credit parameter.
@@ -57,11 +59,10 @@ class Obligor:
         self._alpha: int = alpha
         self._beta: int = beta
 
-        self._outstanding_loans: Dict[str, Loan] = {}
-        self._settled_loans: Dict[str, Loan] = {}
-        self._loans_per_protocol: Dict[str, int] = {}
+        self._set_migration_params(migration_params)
 
-        # set migration params
+    def _set_migration_params(self, migration_params: MigrationParams) -> None:
+        """Copy migration params onto the obligor."""
         # for origination
         self._c0 = migration_params.c0
         self._xi0 = migration_params.xi0
@@ -111,6 +112,56 @@ class Obligor:
             self._alpha = min(self._alpha, self._sum_ab_cap)
             self._beta = min(self._beta, self._sum_ab_cap)
 
+    @staticmethod
+    def _compute_score(proba: float):
+        return round(100 * proba)
+
+    def get_proba(self) -> float:
+        return self._alpha / (self._alpha + self._beta)
+
+    def get_score(self) -> int:
+        return self._compute_score(self.get_proba())
+
+    def get_variance(self) -> float:
+        return (self._alpha * self._beta) / (
+            ((self._alpha + self._beta) ** 2) * (self._alpha + self._beta + 1)
+        )
+
+    def get_conf_interval(self, z: int = 2) -> Tuple[int, int]:
+        # get variance
+        stdev: float = self.get_variance() ** 0.5
+
+        # get bounds
+        proba = self.get_proba()
+        lower_bound: float = max(proba - z * stdev, 0)
+        upper_bound: float = max(proba + z * stdev, 0)
+
+        # get score
+        lower_score: float = self._compute_score(lower_bound)
+        upper_score: float = self._compute_score(upper_bound)
+
+        return (lower_score, upper_score)
+
+
+class Obligor(BaseObligor):
+    def __init__(
+        self,
+        alpha: int,
+        beta: int,
+        migration_params: MigrationParams = MIGRATION_PARAMS,
+    ) -> None:
+        """Create obligor class
+
+        Args:
+            alpha (int): Initial value for good credit parameter.
+            beta (int): Initial value for bad credit parameter.
+        """
+        super().__init__(alpha=alpha, beta=beta, migration_params=migration_params)
+
+        self._outstanding_loans: Dict[str, Loan] = {}
+        self._settled_loans: Dict[str, Loan] = {}
+        self._loans_per_protocol: Dict[str, int] = {}
+
     def _add_loan(
         self,
         amount: float,
@@ -127,10 +178,6 @@ class Obligor:
 
         self._inc_origination()  # increment following scheme for new debt
 
-    @staticmethod
-    def _compute_score(proba: float):
-        return round(100 * proba)
-
     def _get_loan_id(self, protocol_name: str, loan_num: int) -> str:
         return "loan_{0}_{1}".format(protocol_name, str(loan_num))
 
@@ -285,29 +332,3 @@ class Obligor:
         
     def get_loans(self) -> Dict[str, Dict[str, object]]:
         return self._outstanding_loans
-
-    def get_proba(self) -> float:
-        return self._alpha / (self._alpha + self._beta)
-
-    def get_score(self) -> int:
-        return self._compute_score(self.get_proba())
-
-    def get_variance(self) -> float:
-        return (self._alpha * self._beta) / (
-            ((self._alpha + self._beta) ** 2) * (self._alpha + self._beta + 1)
-        )
-
-    def get_conf_interval(self, z: int = 2) -> Tuple[int, int]:
-        # get variance
-        stdev: float = self.get_variance() ** 0.5
-
-        # get bounds
-        proba = self.get_proba()
-        lower_bound: float = max(proba - z * stdev, 0)
-        upper_bound: float = max(proba + z * stdev, 0)
-
-        # get score
-        lower_score: float = self._compute_score(lower_bound)
-        upper_score: float = self._compute_score(upper_bound)
-
-        return (lower_score, upper_score)
@@ -0,0 +1,188 @@
+"""Scores an event dump of the example jsons out of core, with tiny runs and merges."""
+
+import glob
+import json
+import os
+import random
+import shutil
+
+import pytest
+
+from lib.batch_score import score_event_dump
+from lib.compute_score import compute_score
+
+EXAMPLE_DIR = os.path.join(os.path.dirname(__file__), "..", "..", "..", "example_jsons")
+
+# a few events per sorted run, merged two at a time, so phase 1 spills
+# dozens of runs and takes several merge passes
+SORT_KWARGS = {"memory_budget": 2000, "fan_in": 2}
+
+# withdraws collateral it never deposited
+BAD_WALLET = "0x00000000000000000000000000000000000000ba"
+BAD_EVENTS = [{"amount": 1, "amountUSD": 1.0, "timestamp": 1, "logIndex": 0, "symbol": "USDC", "type": "withdraw"}]
+
+
+def example_events():
+    """wallet -> events, example jsons plus one wallet that can't be replayed."""
+    events = {BAD_WALLET: BAD_EVENTS}
+    for path in sorted(glob.glob(os.path.join(EXAMPLE_DIR, "*.json"))):
+        with open(path, "r") as f:
+            events[os.path.basename(path)[: -len(".json")].lower()] = json.load(f)
+    return events
+
+
+def mixed_case(address: str, rng: random.Random) -> str:
+    return "".join(c.upper() if rng.random() < 0.5 else c for c in address)
+
+
+def write_dump(path: str, events, seed: int = 0) -> None:
+    """Shuffled lines, each wallet's address in several casings."""
+    rng = random.Random(seed)
+    lines = [
+        json.dumps(dict(event, address=mixed_case(wallet, rng)))
+        for wallet, wallet_events in events.items()
+        for event in wallet_events
+    ]
+    rng.shuffle(lines)
+    with open(path, "w") as f:
+        f.write("\n".join(lines) + "\n")
+
+
+def read_output(path: str):
+    with open(path, "r") as f:
+        return [json.loads(line) for line in f]
+
+
+def expected_result(wallet_events):
+    """Score fields from compute_score, or None if the wallet can't be replayed."""
+    try:
+        obl = compute_score(input_data=wallet_events, start_alpha=10, start_beta=10)
+    except Exception:
+        return None
+    return {"alpha": obl._alpha, "beta": obl._beta, "score": obl.get_score()}
+
+
+@pytest.fixture
+def dump(tmp_path):
+    events = example_events()
+    input_path = str(tmp_path / "events.jsonl")
+    write_dump(input_path, events)
+    return {
+        "events": events,
+        "input_path": input_path,
+        "output_path": str(tmp_path / "scores.jsonl"),
+        "work_dir": str(tmp_path / "work"),
+    }
+
+
+def run(dump, **kwargs) -> int:
+    os.makedirs(dump["work_dir"], exist_ok=True)
+    params = dict(
+        input_path=dump["input_path"],
+        output_path=dump["output_path"],
+        work_dir=dump["work_dir"],
+        start_alpha=10,
+        start_beta=10,
+        **SORT_KWARGS,
+    )
+    params.update(kwargs)
+    return score_event_dump(**params)
+
+
+def assert_scores(dump) -> None:
+    results = read_output(dump["output_path"])
+    addresses = [result["address"] for result in results]
+    assert addresses == sorted(dump["events"])  # each wallet once, in order
+
+    for result in results:
+        wallet_events = dump["events"][result["address"]]
+        assert result["num_events"] <= len(wallet_events)
+        expected = expected_result(wallet_events)
+        if expected is None:
+            assert "error" in result
+        else:
+            assert result["num_events"] == len(wallet_events)
+            assert {key: result[key] for key in expected} == expected
+
+
+@pytest.mark.parametrize("score_only", [True, False])
+def test_scores_match_compute_score(dump, score_only):
+    assert run(dump, score_only=score_only) == len(dump["events"])
+    # several runs were merged down to at most fan_in
+    with open(os.path.join(dump["work_dir"], "manifest.json"), "r") as f:
+        assert len(json.load(f)["runs"]) <= SORT_KWARGS["fan_in"]
+    assert_scores(dump)
+
+
+def test_bad_wallet_gets_error_line(dump):
+    run(dump)
+    results = {result["address"]: result for result in read_output(dump["output_path"])}
+    assert results[BAD_WALLET] == {"address": BAD_WALLET, "num_events": 0, "error": "KeyError('USDC')"}
+
+
+def test_resume_writes_each_wallet_once(dump):
+    progress_path = os.path.join(dump["work_dir"], "progress.json")
+    early_progress = []
+
+    def on_progress(num_wallets, num_events):
+        if not early_progress:
+            with open(progress_path, "r") as f:
+                early_progress.append(f.read())
+
+    run(dump, checkpoint_every=3, on_progress=on_progress)
+    with open(dump["output_path"], "rb") as f:
+        full_output = f.read()
+
+    # as if killed partway through a later wallet, after the first marker
+    with open(progress_path, "w") as f:
+        f.write(early_progress[0])
+    output_bytes = json.loads(early_progress[0])["output_bytes"]
+    with open(dump["output_path"], "r+b") as f:
+        f.truncate(output_bytes + (len(full_output) - output_bytes) // 2)
+
+    assert run(dump, checkpoint_every=3) == len(dump["events"]) - 3
+    with open(dump["output_path"], "rb") as f:
+        assert f.read() == full_output
+    assert_scores(dump)
+
+
+def test_changed_input_restarts_sort(dump):
+    run(dump)
+    # another wallet, so the input changes size (and mtime)
+    dump["events"]["0x00000000000000000000000000000000000000aa"] = [
+        {"amount": 5, "amountUSD": 5.0, "timestamp": 1, "logIndex": 0, "symbol": "USDC", "type": "deposit"}
+    ]
+    write_dump(dump["input_path"], dump["events"], seed=1)
+
+    assert run(dump) == len(dump["events"])
+    assert_scores(dump)
+
+
+def test_deleted_output_restarts_replay(dump):
+    run(dump)
+    os.remove(dump["output_path"])
+    assert run(dump) == len(dump["events"])
+    assert_scores(dump)
+
+
+def test_new_output_path_restarts_replay(dump, tmp_path):
+    run(dump)
+    shutil.move(dump["output_path"], str(tmp_path / "old_scores.jsonl"))
+    dump["output_path"] = str(tmp_path / "new_scores.jsonl")
+    assert run(dump) == len(dump["events"])
+    assert_scores(dump)
+
+
+def test_changed_params_restart_replay(dump):
+    run(dump)
+    assert run(dump) == 0  # nothing left to do
+    assert run(dump, start_beta=12) == len(dump["events"])
+    results = read_output(dump["output_path"])
+    assert [result["address"] for result in results] == sorted(dump["events"])
+
+
+def test_progress_reported_once_per_count(dump):
+    calls = []
+    num_wallets = len(dump["events"])
+    run(dump, checkpoint_every=num_wallets, on_progress=lambda *args: calls.append(args))
+    assert [wallets for wallets, _ in calls] == [num_wallets]
@@ -0,0 +1,102 @@
+"""Checks the interpolated Beta quantile grid against the exact inverse."""
+
+import numpy as np
+import pytest
+from scipy import stats
+
+from lib.beta_intervals import BetaQuantileTable, batch_conf_interval, beta_quantiles
+from lib.default_migration_params import MIGRATION_PARAMS
+
+CAP = MIGRATION_PARAMS.cap
+LEVELS = (0.025, 0.975)
+
+
+def random_params(n: int, seed: int = 0):
+    """alpha / beta within [0.5, cap] and alpha + beta <= cap, like stickness keeps them."""
+    rng = np.random.default_rng(seed)
+    total = rng.uniform(1.0, CAP, n)
+    share = rng.uniform(0, 1, n)
+    return np.maximum(total * share, 0.5), np.maximum(total * (1 - share), 0.5)
+
+
+def test_grid_within_documented_error():
+    alpha, beta = random_params(20000)
+    grid = beta_quantiles(alpha, beta, levels=LEVELS)
+    exact = beta_quantiles(alpha, beta, levels=LEVELS, exact=True)
+    assert grid.shape == exact.shape == (2, len(alpha))
+    assert np.abs(grid - exact).max() < 1e-5
+
+
+def test_grid_nodes_are_exact():
+    table = BetaQuantileTable(levels=LEVELS, cap=CAP, num_nodes=16)
+    nodes = np.exp(np.linspace(np.log(0.5), np.log(CAP), 16))
+    alpha, beta = np.repeat(nodes, 16), np.tile(nodes, 16)
+    np.testing.assert_allclose(
+        table.quantiles(alpha, beta), beta_quantiles(alpha, beta, levels=LEVELS, exact=True), rtol=1e-12
+    )
+
+
+def test_off_grid_uses_exact():
+    # below min_param, above cap, and one of each
+    alpha = np.array([0.1, 0.3, 250.0, 0.2, 300.0, 5.0])
+    beta = np.array([0.2, 4.0, 10.0, 400.0, 0.4, 0.05])
+    quantiles = beta_quantiles(alpha, beta, levels=LEVELS)
+    np.testing.assert_array_equal(quantiles, beta_quantiles(alpha, beta, levels=LEVELS, exact=True))
+    np.testing.assert_allclose(
+        quantiles, stats.beta.ppf(np.array(LEVELS)[:, None], alpha[None, :], beta[None, :]), rtol=1e-9
+    )
+
+
+@pytest.mark.parametrize("exact", [False, True])
+def test_degenerate_params(exact):
+    alpha = np.array([0.0, 0.0, 3.0, 10.0])
+    beta = np.array([5.0, 0.0, 0.0, 10.0])
+    quantiles = beta_quantiles(alpha, beta, levels=LEVELS, exact=exact)
+    # alpha of 0 puts all mass on 0, beta of 0 (alone) on 1
+    np.testing.assert_array_equal(quantiles[:, :3], [[0.0, 0.0, 1.0], [0.0, 0.0, 1.0]])
+    assert 0 < quantiles[0, 3] < quantiles[1, 3] < 1
+
+
+@pytest.mark.parametrize("exact", [False, True])
+@pytest.mark.parametrize("bad", [np.nan, np.inf, -np.inf])
+def test_rejects_non_finite_params(bad, exact):
+    with pytest.raises(ValueError):
+        beta_quantiles([1.0, bad], [2.0, 3.0], exact=exact)
+    with pytest.raises(ValueError):
+        batch_conf_interval([1.0, 2.0], [bad, 3.0], exact=exact)
+
+
+@pytest.mark.parametrize("exact", [False, True])
+@pytest.mark.parametrize("levels", [(0.0, 0.5), (0.5, 1.0), (-0.1,), (1.5,), (np.nan,)])
+def test_rejects_levels_outside_unit_interval(levels, exact):
+    with pytest.raises(ValueError):
+        beta_quantiles([1.0], [2.0], levels=levels, exact=exact)
+
+
+def test_table_rejects_levels_outside_unit_interval():
+    with pytest.raises(ValueError):
+        BetaQuantileTable(levels=(0.5, 1.0))
+
+
+def test_rejects_mismatched_lengths():
+    with pytest.raises(ValueError):
+        beta_quantiles([1.0, 2.0], [3.0])
+
+
+@pytest.mark.parametrize("mass", [0.95, 0.5])
+def test_exact_conf_interval_matches_scipy(mass):
+    alpha, beta = random_params(2000, seed=1)
+    lower, upper = batch_conf_interval(alpha, beta, mass=mass, exact=True)
+    tail = (1 - mass) / 2
+    assert lower.tolist() == [round(100 * stats.beta.ppf(tail, a, b)) for a, b in zip(alpha, beta)]
+    assert upper.tolist() == [round(100 * stats.beta.ppf(1 - tail, a, b)) for a, b in zip(alpha, beta)]
+
+
+def test_grid_conf_interval_rarely_flips():
+    alpha, beta = random_params(20000, seed=2)
+    grid = batch_conf_interval(alpha, beta)
+    exact = batch_conf_interval(alpha, beta, exact=True)
+    for approx, want in zip(grid, exact):
+        # ~1e-5 of error can only move a score across a rounding boundary
+        assert np.abs(approx - want).max() <= 1
+        assert (approx != want).mean() < 1e-3
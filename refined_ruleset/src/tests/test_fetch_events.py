@@ -0,0 +1,141 @@
+"""Fetches the example jsons back from the local fixture server."""
+
+import asyncio
+import glob
+import json
+import os
+import threading
+
+import pytest
+
+from lib.fetch_events import EventFetcher, FetchError, fetch_events
+from lib.fixture_server import FixtureServer, _Handler
+
+EXAMPLE_DIR = os.path.join(os.path.dirname(__file__), "..", "..", "..", "example_jsons")
+
+
+def expected_records():
+    """wallet -> example json records, in the order fetch returns them."""
+    expected = {}
+    for path in sorted(glob.glob(os.path.join(EXAMPLE_DIR, "*.json"))):
+        with open(path, "r") as f:
+            records = json.load(f)
+        wallet = os.path.basename(path)[: -len(".json")].lower()
+        expected[wallet] = sorted(records, key=lambda rec: (rec["timestamp"], rec["logIndex"]))
+    return expected
+
+
+class _CountingHandler(_Handler):
+    """Tracks the most requests the server saw in flight at once."""
+
+    def do_POST(self) -> None:
+        server = self.server
+        with server.lock:
+            server.in_flight += 1
+            server.max_in_flight = max(server.max_in_flight, server.in_flight)
+        try:
+            super().do_POST()
+        finally:
+            with server.lock:
+                server.in_flight -= 1
+
+
+class _FlakyHandler(_Handler):
+    """Answers the first few requests with a 503."""
+
+    def do_POST(self) -> None:
+        server = self.server
+        with server.lock:
+            fail = server.failures > 0
+            server.failures -= 1
+        if fail:
+            self.rfile.read(int(self.headers.get("Content-Length", 0)))
+            self._send(503, {"errors": [{"message": "unavailable"}]})
+            return
+        super().do_POST()
+
+
+class _GraphQLErrorHandler(_Handler):
+    def do_POST(self) -> None:
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        with self.server.lock:
+            self.server.requests += 1
+        self._send(200, {"errors": [{"message": "Type `Query` has no field `deposits`"}]})
+
+
+@pytest.fixture
+def server():
+    srv = FixtureServer()
+    srv.lock = threading.Lock()
+    srv.in_flight = 0
+    srv.max_in_flight = 0
+    srv.failures = 0
+    srv.requests = 0
+    with srv:
+        yield srv
+
+
+def test_records_match_example_jsons(server):
+    expected = expected_records()
+    # a small page size, so most (wallet, entity) chains take several pages
+    fetched = fetch_events(list(expected), url=server.url, page_size=3, max_concurrency=4)
+    assert fetched == expected
+
+
+def test_resume_from_torn_checkpoint(server, tmp_path):
+    expected = expected_records()
+    checkpoint_path = str(tmp_path / "checkpoint.jsonl")
+    fetch_events(list(expected), url=server.url, page_size=3, checkpoint_path=checkpoint_path)
+
+    # keep some finished pages and half of the next, as if killed mid write
+    with open(checkpoint_path, "rb") as f:
+        lines = f.readlines()
+    assert len(lines) > 10
+    with open(checkpoint_path, "wb") as f:
+        f.writelines(lines[:10])
+        f.write(lines[10][: len(lines[10]) // 2])
+
+    fetched = fetch_events(list(expected), url=server.url, page_size=3, checkpoint_path=checkpoint_path)
+    assert fetched == expected
+
+    # every page is logged once and the log parses cleanly
+    with open(checkpoint_path, "rb") as f:
+        pages = [json.loads(line) for line in f]
+    keys = [(page["wallet"], page["entity"], page["cursor"]) for page in pages]
+    assert len(keys) == len(set(keys)) == len(lines)
+
+
+def test_retries_unavailable(server):
+    server.RequestHandlerClass = _FlakyHandler
+    server.failures = 3
+    expected = expected_records()
+    fetched = fetch_events(list(expected), url=server.url, max_concurrency=1, backoff_base=0.01)
+    assert fetched == expected
+    assert server.failures < 0  # the failures were all served
+
+
+def test_gives_up_after_retries(server):
+    server.RequestHandlerClass = _FlakyHandler
+    server.failures = 100
+    with pytest.raises(FetchError):
+        fetch_events(list(expected_records())[:1], url=server.url, max_concurrency=1, max_retries=2, backoff_base=0.01)
+
+
+def test_graphql_errors_are_not_retried(server):
+    server.RequestHandlerClass = _GraphQLErrorHandler
+    with pytest.raises(FetchError, match="graphql errors"):
+        fetch_events(list(expected_records())[:1], url=server.url, max_concurrency=1, backoff_base=1.0)
+    assert server.requests == 1
+
+
+@pytest.mark.parametrize("max_concurrency", [4, 40])
+def test_max_concurrency_bounds_in_flight(server, max_concurrency):
+    server.RequestHandlerClass = _CountingHandler
+    server.latency = 0.2
+    # unknown wallets get single (empty) page chains, 5 per wallet,
+    # enough of them to keep every worker busy
+    wallets = ["0x{0:040x}".format(i) for i in range(max_concurrency // 5 + 1)]
+    fetched = asyncio.run(EventFetcher(url=server.url, max_concurrency=max_concurrency).fetch(wallets))
+    assert fetched == {wallet: [] for wallet in wallets}
+    # 40 is above the default executor's thread cap on most machines
+    assert server.max_in_flight == max_concurrency
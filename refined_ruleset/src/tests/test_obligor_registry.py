@@ -0,0 +1,94 @@
+"""Ingests the example jsons through the sharded registry from several threads."""
+
+import glob
+import json
+import os
+import threading
+
+import pytest
+
+from lib.compute_score import apply_event, compute_score
+from lib.obligor_registry import ObligorRegistry
+from lib.obligor_v2 import Obligor
+
+EXAMPLE_DIR = os.path.join(os.path.dirname(__file__), "..", "..", "..", "example_jsons")
+
+
+def example_events():
+    """wallet -> events sorted by (timestamp, logIndex), each tagged with its address."""
+    events = {}
+    for path in sorted(glob.glob(os.path.join(EXAMPLE_DIR, "*.json"))):
+        wallet = os.path.basename(path)[: -len(".json")].lower()
+        with open(path, "r") as f:
+            records = json.load(f)
+        records.sort(key=lambda rec: (int(rec["timestamp"]), int(rec["logIndex"])))
+        events[wallet] = [dict(record, address=wallet) for record in records]
+    return events
+
+
+@pytest.mark.parametrize("score_only", [False, True])
+def test_threads_per_shard_match_compute_score(score_only):
+    events = example_events()
+    registry = ObligorRegistry(start_alpha=10, start_beta=10, num_shards=4, score_only=score_only)
+    failed = set()
+
+    def ingest(partition):
+        for event in partition:
+            if event["address"] in failed:
+                continue  # compute_score stops at the first bad event
+            try:
+                registry.apply_event(event["address"], event)
+            except Exception:
+                failed.add(event["address"])
+
+    # events of every wallet interleaved, order within a wallet kept
+    interleaved = [
+        wallet_events[i]
+        for i in range(max(map(len, events.values())))
+        for wallet_events in events.values()
+        if i < len(wallet_events)
+    ]
+    threads = [threading.Thread(target=ingest, args=(partition,)) for partition in registry.partition(interleaved)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(registry) == len(events)
+    num_scored = 0
+    for wallet, wallet_events in events.items():
+        try:
+            obl = compute_score(input_data=wallet_events, start_alpha=10, start_beta=10)
+        except Exception:
+            assert wallet in failed
+            continue
+        snapshot = registry.get_snapshot(wallet.upper())
+        assert (snapshot.alpha, snapshot.beta, snapshot.score) == (obl._alpha, obl._beta, obl.get_score())
+        num_scored += 1
+    assert num_scored > 0
+
+
+def test_snapshot_published_when_batch_fails():
+    wallet = "0x00000000000000000000000000000000000000ab"
+    events = [
+        {"amount": 100, "timestamp": 1, "logIndex": 0, "symbol": "USDC", "type": "deposit"},
+        {"amount": 50, "timestamp": 2, "logIndex": 0, "symbol": "DAI", "type": "borrow"},
+        # never deposited
+        {"amount": 10, "timestamp": 3, "logIndex": 0, "symbol": "WETH", "type": "withdraw"},
+        {"amount": 50, "timestamp": 4, "logIndex": 0, "symbol": "DAI", "type": "repay"},
+    ]
+    registry = ObligorRegistry(start_alpha=10, start_beta=10)
+    with pytest.raises(KeyError):
+        registry.apply_events(wallet, events)
+
+    expected = Obligor(alpha=10, beta=10)
+    for event in events[:2]:
+        apply_event(obl=expected, event=event)
+    snapshot = registry.get_snapshot(wallet)
+    assert (snapshot.alpha, snapshot.beta, snapshot.score) == (expected._alpha, expected._beta, expected.get_score())
+    assert wallet in registry
+
+
+def test_rejects_zero_start():
+    with pytest.raises(ValueError):
+        ObligorRegistry(start_alpha=0, start_beta=0)
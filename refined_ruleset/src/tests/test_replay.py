@@ -0,0 +1,111 @@
+"""Replays the example jsons through every obligor flavour, and checks the score gradient."""
+
+import glob
+import json
+import os
+
+import pytest
+
+from lib.compute_score import apply_event, compute_score, compute_score_and_grad
+from lib.credit_migration_schema import MigrationParams
+from lib.default_migration_params import MIGRATION_PARAMS
+from lib.obligor_v2 import Obligor
+from lib.obligor_score_only import ScoreOnlyObligor
+from lib.obligor_sensitivity import SENSITIVITY_PARAMS, SensitivityObligor
+
+EXAMPLE_DIR = os.path.join(os.path.dirname(__file__), "..", "..", "..", "example_jsons")
+EXAMPLE_FILES = sorted(glob.glob(os.path.join(EXAMPLE_DIR, "*.json")))
+
+# small cap so stickness binds on most wallets
+BINDING_CAP_PARAMS = MigrationParams(c0=1.3, xi0=50, c1=2.1, xi1=80, c2=3.0, xi2=20, cap=25)
+PARAMS = {"default": MIGRATION_PARAMS, "binding_cap": BINDING_CAP_PARAMS}
+
+
+def load_events(path: str):
+    with open(path, "r") as f:
+        return json.load(f)
+
+
+def sorted_events(path: str):
+    return sorted(load_events(path), key=lambda e: (int(e["timestamp"]), int(e["logIndex"])))
+
+
+def replay(obligor_cls, events, migration_params, protocol_name):
+    """(alpha, beta) after the events, or the exception type raised."""
+    obl = obligor_cls(alpha=10, beta=10, migration_params=migration_params)
+    try:
+        for event in events:
+            apply_event(obl=obl, event=event, protocol_name=protocol_name)
+    except Exception as e:
+        return type(e)
+    return (obl._alpha, obl._beta)
+
+
+@pytest.mark.parametrize("params_name", sorted(PARAMS))
+@pytest.mark.parametrize("protocol_name", ["aave_v3", ""])
+@pytest.mark.parametrize("path", EXAMPLE_FILES, ids=os.path.basename)
+def test_score_only_matches_obligor(path, protocol_name, params_name):
+    events = sorted_events(path)
+    migration_params = PARAMS[params_name]
+
+    expected = replay(Obligor, events, migration_params, protocol_name)
+    assert replay(ScoreOnlyObligor, events, migration_params, protocol_name) == expected
+    assert replay(SensitivityObligor, events, migration_params, protocol_name) == expected
+
+
+def with_param(migration_params: MigrationParams, name: str, value: float) -> MigrationParams:
+    fields = {field: getattr(migration_params, field) for field in SENSITIVITY_PARAMS}
+    fields[name] = value
+    return MigrationParams(**fields)
+
+
+def unrounded_score(events, migration_params, protocol_name) -> float:
+    obl = compute_score(
+        input_data=events,
+        start_alpha=10,
+        start_beta=10,
+        migration_params=migration_params,
+        protocol_name=protocol_name,
+    )
+    return 100 * obl.get_proba()
+
+
+@pytest.mark.parametrize("params_name", sorted(PARAMS))
+@pytest.mark.parametrize("path", EXAMPLE_FILES, ids=os.path.basename)
+def test_score_grad_matches_central_differences(path, params_name):
+    events = load_events(path)
+    migration_params = PARAMS[params_name]
+    protocol_name = "aave_v3"
+    if not isinstance(replay(Obligor, sorted_events(path), migration_params, protocol_name), tuple):
+        pytest.skip("wallet can't be replayed")
+
+    score, grad = compute_score_and_grad(
+        input_data=events,
+        start_alpha=10,
+        start_beta=10,
+        migration_params=migration_params,
+        protocol_name=protocol_name,
+    )
+    assert score == compute_score(events, 10, 10, migration_params, protocol_name).get_score()
+
+    for name, d_score in zip(SENSITIVITY_PARAMS, grad):
+        value = getattr(migration_params, name)
+        h = 1e-6 * max(1.0, abs(value))
+        up = unrounded_score(events, with_param(migration_params, name, value + h), protocol_name)
+        down = unrounded_score(events, with_param(migration_params, name, value - h), protocol_name)
+        assert d_score == pytest.approx((up - down) / (2 * h), rel=1e-4, abs=1e-6), name
+
+
+def test_binding_cap_has_cap_sensitivity():
+    cap_ix = SENSITIVITY_PARAMS.index("cap")
+    cap_grads = []
+    for path in EXAMPLE_FILES:
+        obl = SensitivityObligor(alpha=10, beta=10, migration_params=BINDING_CAP_PARAMS)
+        try:
+            for event in sorted_events(path):
+                apply_event(obl=obl, event=event, protocol_name="aave_v3")
+        except Exception:
+            continue
+        cap_grads.append(obl.get_alpha_grad()[cap_ix] + obl.get_beta_grad()[cap_ix])
+    # d(alpha + beta) / d cap is 1 once the sum sits on the cap
+    assert any(grad == pytest.approx(1.0) for grad in cap_grads)